@@ -0,0 +1,47 @@
+import heapq
+import itertools
+import math
+
+import networkx as nx
+
+
+def bounded_dijkstra(
+    graph: nx.Graph,
+    source: str,
+    cutoff: int | float | None = None,
+    count: int | None = None,
+    reverse: bool = False,
+) -> dict[str, int | float]:
+    """
+    Dijkstra's algorithm which stops as soon as the next settled node would be
+    further than `cutoff` or `count` nodes have been settled. The returned
+    distances are ordered from the nearest node. With `reverse`, edges of a
+    directed graph are followed backwards (distances to `source`).
+    """
+    adjacency = graph.pred if reverse and graph.is_directed() else graph.adj
+    distances: dict[str, int | float] = {}
+    if count is not None and count < 1:
+        return distances
+
+    tentative: dict[str, int | float] = {source: 0}
+    counter = itertools.count()
+    heap = [(0, next(counter), source)]
+
+    while heap:
+        distance, _, node = heapq.heappop(heap)
+        if node in distances:
+            continue
+        if cutoff is not None and distance > cutoff:
+            break
+
+        distances[node] = distance
+        if count is not None and len(distances) >= count:
+            break
+
+        for neighbor, edge_data in adjacency[node].items():
+            neighbor_distance = distance + edge_data.get("weight", 1)
+            if neighbor not in distances and neighbor_distance < tentative.get(neighbor, math.inf):
+                tentative[neighbor] = neighbor_distance
+                heapq.heappush(heap, (neighbor_distance, next(counter), neighbor))
+
+    return distances
@@ -0,0 +1,43 @@
+import os
+import pickle
+from typing import Any
+
+
+CHECKPOINT_EXTENSION = ".grlc"
+
+
+class Checkpoint:
+    """
+    Variables of a running program, the index of the top-level statement to
+    continue from and a hash of the program's tokens, used to check that the
+    same program is resumed. Graphs are pickled together with the other
+    variables, so node names and adjacency shared between graphs (e.g. by
+    snapshots) stay shared after loading. Disk graphs only store the path of
+    their file, so their contents are not rolled back when resuming.
+    """
+
+    def __init__(self, variables: dict[str, Any], position: int, program_hash: str):
+        self.variables = variables
+        self.position = position
+        self.program_hash = program_hash
+
+    def save(self, file_path: str):
+        # Written next to the target and renamed, so that a crash while saving
+        # leaves the previous checkpoint intact
+        temporary_path = file_path + CHECKPOINT_EXTENSION + ".tmp"
+        with open(temporary_path, "wb") as file:
+            pickle.dump(self, file, pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary_path, file_path + CHECKPOINT_EXTENSION)
+
+    @staticmethod
+    def load(file_path: str) -> "Checkpoint":
+        with open(file_path + CHECKPOINT_EXTENSION, "rb") as file:
+            checkpoint = pickle.load(file)
+
+        if not isinstance(checkpoint, Checkpoint):
+            raise ValueError(f"File {file_path + CHECKPOINT_EXTENSION} is not a GRL checkpoint")
+
+        return checkpoint
@@ -0,0 +1,338 @@
+import sqlite3
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterator, MutableMapping
+
+import networkx as nx
+
+
+CACHED_NEIGHBOR_LIMIT = 1_000_000
+WRITE_BATCH_SIZE = 10_000
+
+OUTGOING = "outgoing"
+INCOMING = "incoming"
+
+
+class SqliteStore:
+    """
+    Node and edge tables of a disk-backed graph, with an LRU cache of
+    adjacency lists bounded by the total number of cached neighbors. Writes
+    are committed in batches of `WRITE_BATCH_SIZE`.
+
+    Undirected edges are stored in both directions, so neighbors of a node are
+    always found through the (source, dest) primary key.
+    """
+
+    def __init__(self, path: str, directed: bool):
+        self.path = path
+        self.directed = directed
+        self.pending_writes = 0
+        self.cached_neighbors = 0
+        self.cache: OrderedDict[tuple[str, str], dict[str, int | float | None]] = OrderedDict()
+
+        self.connection = self._connect()
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS nodes (name TEXT PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS edges (
+                source TEXT, dest TEXT, weight, PRIMARY KEY (source, dest)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS edges_by_dest ON edges (dest, source);
+        """)
+
+        graph_type = "DIGRAPH" if directed else "GRAPH"
+        row = self.connection.execute("SELECT value FROM metadata WHERE key = 'type'").fetchone()
+        if row is None:
+            self.connection.execute("INSERT INTO metadata VALUES ('type', ?)", (graph_type,))
+            self.connection.commit()
+        elif row[0] != graph_type:
+            self.connection.close()
+            raise ValueError(f"File {path} contains a {row[0]}, not a {graph_type}")
+
+        self._finalizer = weakref.finalize(self, SqliteStore._close, self.connection)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    @staticmethod
+    def _close(connection: sqlite3.Connection):
+        connection.commit()
+        connection.close()
+
+    def reconnect(self):
+        """Opens a new connection, e.g. in a forked process."""
+        self.connection = self._connect()
+
+    def flush(self):
+        self.connection.commit()
+        self.pending_writes = 0
+
+    def _written(self, *affected: tuple[str, str]):
+        for key in affected:
+            if (neighbors := self.cache.pop(key, None)) is not None:
+                self.cached_neighbors -= len(neighbors)
+
+        self.pending_writes += 1
+        if self.pending_writes >= WRITE_BATCH_SIZE:
+            self.flush()
+
+    def _edge_keys(self, source: str, dest: str) -> list[tuple[str, str]]:
+        if self.directed:
+            return [(OUTGOING, source), (INCOMING, dest)]
+
+        return [(OUTGOING, source), (OUTGOING, dest)]
+
+    # ----- NODES -----
+
+    def has_node(self, node: str) -> bool:
+        if (OUTGOING, node) in self.cache:
+            return True
+
+        return self.connection.execute(
+            "SELECT 1 FROM nodes WHERE name = ?", (node,)
+        ).fetchone() is not None
+
+    def node_count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def iter_nodes(self) -> Iterator[str]:
+        for (name,) in self.connection.execute("SELECT name FROM nodes"):
+            yield name
+
+    def add_node(self, node: str):
+        self.connection.execute("INSERT OR IGNORE INTO nodes VALUES (?)", (node,))
+        self._written()
+
+    def remove_node(self, node: str, direction: str):
+        """
+        Removes the edges of `node` in the given direction, and the node itself
+        once no edges can be left (i.e. after removing the incoming edges of a
+        directed graph or the edges of an undirected one).
+        """
+        neighbors = list(self.neighbors(node, direction))
+        if direction == OUTGOING:
+            self.connection.execute("DELETE FROM edges WHERE source = ?", (node,))
+        if direction == INCOMING or not self.directed:
+            self.connection.execute("DELETE FROM edges WHERE dest = ?", (node,))
+            self.connection.execute("DELETE FROM nodes WHERE name = ?", (node,))
+
+        self._written(
+            (OUTGOING, node), (INCOMING, node),
+            *((key, neighbor) for neighbor in neighbors for key in (OUTGOING, INCOMING))
+        )
+
+    # ----- EDGES -----
+
+    def neighbors(self, node: str, direction: str) -> dict[str, int | float | None]:
+        key = (direction, node)
+        if (neighbors := self.cache.get(key)) is not None:
+            self.cache.move_to_end(key)
+            return neighbors
+
+        query = (
+            "SELECT dest, weight FROM edges WHERE source = ?"
+            if direction == OUTGOING
+            else "SELECT source, weight FROM edges WHERE dest = ?"
+        )
+        neighbors = dict(self.connection.execute(query, (node,)).fetchall())
+
+        self.cache[key] = neighbors
+        self.cached_neighbors += len(neighbors)
+        while self.cached_neighbors > CACHED_NEIGHBOR_LIMIT and len(self.cache) > 1:
+            _, evicted = self.cache.popitem(last=False)
+            self.cached_neighbors -= len(evicted)
+
+        return neighbors
+
+    def edge_weight(self, source: str, dest: str) -> tuple[bool, int | float | None]:
+        if (neighbors := self.cache.get((OUTGOING, source))) is not None:
+            return dest in neighbors, neighbors.get(dest)
+
+        row = self.connection.execute(
+            "SELECT weight FROM edges WHERE source = ? AND dest = ?", (source, dest)
+        ).fetchone()
+
+        return row is not None, None if row is None else row[0]
+
+    def set_edge(self, source: str, dest: str, weight: int | float | None):
+        rows = [(source, dest, weight)]
+        if not self.directed and source != dest:
+            rows.append((dest, source, weight))
+
+        self.connection.executemany("INSERT OR REPLACE INTO edges VALUES (?, ?, ?)", rows)
+        self._written(*self._edge_keys(source, dest))
+
+    def remove_edge_row(self, source: str, dest: str, missing_ok: bool = False):
+        """
+        Removes a single stored direction of an edge, as networkx deletes both
+        directions of an undirected edge separately. For directed graphs the
+        row is deleted once through the successors and once through the
+        predecessors, so the second deletion is allowed to find nothing.
+        """
+        cursor = self.connection.execute(
+            "DELETE FROM edges WHERE source = ? AND dest = ?", (source, dest)
+        )
+        if cursor.rowcount == 0 and not missing_ok:
+            raise KeyError((source, dest))
+
+        self._written(*self._edge_keys(source, dest))
+
+    def has_negative_weights(self) -> bool:
+        return self.connection.execute(
+            "SELECT 1 FROM edges WHERE weight < 0 LIMIT 1"
+        ).fetchone() is not None
+
+
+class EdgeData(MutableMapping):
+    def __init__(self, store: SqliteStore, source: str, dest: str, weight: int | float | None):
+        self.store = store
+        self.source = source
+        self.dest = dest
+        self.weight = weight
+
+    def __getitem__(self, key: str) -> int | float:
+        if key != "weight" or self.weight is None:
+            raise KeyError(key)
+
+        return self.weight
+
+    def __setitem__(self, key: str, value: int | float):
+        if key != "weight":
+            raise ValueError(f"Disk graphs can only store edge weights, not {repr(key)}")
+
+        self.weight = value
+        self.store.set_edge(self.source, self.dest, value)
+
+    def __delitem__(self, key: str):
+        self[key]
+        self.weight = None
+        self.store.set_edge(self.source, self.dest, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(() if self.weight is None else ("weight",))
+
+    def __len__(self) -> int:
+        return 0 if self.weight is None else 1
+
+
+class NeighborMap(MutableMapping):
+    def __init__(self, store: SqliteStore, node: str, direction: str):
+        self.store = store
+        self.node = node
+        self.direction = direction
+
+    def _edge(self, neighbor: str) -> tuple[str, str]:
+        return (self.node, neighbor) if self.direction == OUTGOING else (neighbor, self.node)
+
+    def __getitem__(self, neighbor: str) -> EdgeData:
+        exists, weight = self.store.edge_weight(*self._edge(neighbor))
+        if not exists:
+            raise KeyError(neighbor)
+
+        return EdgeData(self.store, *self._edge(neighbor), weight)
+
+    def __contains__(self, neighbor: object) -> bool:
+        return isinstance(neighbor, str) and self.store.edge_weight(*self._edge(neighbor))[0]
+
+    def __setitem__(self, neighbor: str, edge_data: MutableMapping):
+        self.store.set_edge(*self._edge(neighbor), edge_data.get("weight"))
+
+    def __delitem__(self, neighbor: str):
+        self.store.remove_edge_row(*self._edge(neighbor), missing_ok=self.direction == INCOMING)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.neighbors(self.node, self.direction))
+
+    def __len__(self) -> int:
+        return len(self.store.neighbors(self.node, self.direction))
+
+    def items(self) -> Iterator[tuple[str, EdgeData]]:  # type: ignore
+        for neighbor, weight in self.store.neighbors(self.node, self.direction).items():
+            yield neighbor, EdgeData(self.store, *self._edge(neighbor), weight)
+
+
+class AdjacencyMap(MutableMapping):
+    def __init__(self, store: SqliteStore, direction: str):
+        self.store = store
+        self.direction = direction
+
+    def __getitem__(self, node: str) -> NeighborMap:
+        if not self.store.has_node(node):
+            raise KeyError(node)
+
+        return NeighborMap(self.store, node, self.direction)
+
+    def __contains__(self, node: object) -> bool:
+        return isinstance(node, str) and self.store.has_node(node)
+
+    def __setitem__(self, node: str, neighbors: MutableMapping):
+        self.store.add_node(node)
+        for neighbor, edge_data in neighbors.items():
+            NeighborMap(self.store, node, self.direction)[neighbor] = edge_data
+
+    def __delitem__(self, node: str):
+        self.store.remove_node(node, self.direction)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.store.iter_nodes()
+
+    def __len__(self) -> int:
+        return self.store.node_count()
+
+
+class NodeMap(MutableMapping):
+    def __init__(self, store: SqliteStore):
+        self.store = store
+
+    def __getitem__(self, node: str) -> dict:
+        if not self.store.has_node(node):
+            raise KeyError(node)
+
+        return {}
+
+    def __contains__(self, node: object) -> bool:
+        return isinstance(node, str) and self.store.has_node(node)
+
+    def __setitem__(self, node: str, attributes: dict):
+        self.store.add_node(node)
+
+    def __delitem__(self, node: str):
+        # The node row is removed together with its last edges, see `SqliteStore.remove_node`
+        if not self.store.has_node(node):
+            raise KeyError(node)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.store.iter_nodes()
+
+    def __len__(self) -> int:
+        return self.store.node_count()
+
+
+class DiskGraph(nx.Graph):
+    """
+    Graph whose nodes and edges live in a local SQLite file instead of memory.
+    Node attributes are not stored and edges can only hold a weight.
+    """
+
+    def __init__(self, path: str):
+        self.store = SqliteStore(path, self.is_directed())
+        self.graph = {}
+        self._node = NodeMap(self.store)
+        self._adj = AdjacencyMap(self.store, OUTGOING)
+        self.__networkx_cache__ = {}
+
+    def __reduce__(self):
+        self.store.flush()
+        return (self.__class__, (self.store.path,))
+
+    def has_negative_weights(self) -> bool:
+        return self.store.has_negative_weights()
+
+
+class DiskDiGraph(DiskGraph, nx.DiGraph):
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._pred = AdjacencyMap(self.store, INCOMING)
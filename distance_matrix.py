@@ -0,0 +1,103 @@
+import tempfile
+from collections.abc import Iterable, Iterator, Sequence
+from typing import overload
+
+import numpy as np
+
+
+ITERATION_CHUNK_SIZE = 4096
+
+
+class DistanceMatrix(Sequence):
+    """
+    All-pairs distances stored as a structured array of (source index,
+    dest index, length) rows, instead of one Python tuple per pair. Node
+    names are kept once in `names` and rows are only turned into tuples while
+    being iterated. Slicing returns a view sharing the same rows.
+
+    Rows of matrices built with `on_disk` are written to an anonymous temporary
+    file and memory-mapped, so only the pages being read are kept in memory.
+    """
+
+    def __init__(self, names: list[str], rows: np.ndarray):
+        self.names = names
+        self.rows = rows
+
+    @staticmethod
+    def row_dtype(integral: bool) -> np.dtype:
+        return np.dtype([
+            ("source", np.int32),
+            ("dest", np.int32),
+            ("length", np.int64 if integral else np.float64),
+        ])
+
+    @classmethod
+    def from_lengths(
+        cls,
+        names: list[str],
+        lengths_by_source: Iterable[tuple[str, dict[str, int | float]]],
+        integral: bool,
+        on_disk: bool = False,
+    ) -> "DistanceMatrix":
+        index_by_name = {name: index for index, name in enumerate(names)}
+        dtype = cls.row_dtype(integral)
+
+        def chunks() -> Iterator[np.ndarray]:
+            for source, length_by_dest in lengths_by_source:
+                chunk = np.empty(len(length_by_dest), dtype)
+                chunk["source"] = index_by_name[source]
+                chunk["dest"] = np.fromiter(
+                    (index_by_name[dest] for dest in length_by_dest),
+                    np.int32, len(length_by_dest)
+                )
+                chunk["length"] = np.fromiter(
+                    length_by_dest.values(), dtype["length"], len(length_by_dest)
+                )
+                yield chunk
+
+        if not on_disk:
+            row_chunks = list(chunks())
+            return cls(names, np.concatenate(row_chunks) if row_chunks else np.empty(0, dtype))
+
+        with tempfile.TemporaryFile() as file:
+            row_count = 0
+            for chunk in chunks():
+                file.write(chunk.tobytes())
+                row_count += len(chunk)
+
+            if row_count == 0:
+                return cls(names, np.empty(0, dtype))
+
+            file.flush()
+            return cls(names, np.memmap(file, dtype, mode="r", shape=(row_count,)))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @overload
+    def __getitem__(self, index: int) -> tuple[str, str, int | float]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "DistanceMatrix": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DistanceMatrix(self.names, self.rows[index])
+
+        source, dest, length = self.rows[index].tolist()
+        return self.names[source], self.names[dest], _as_number(length)
+
+    def __iter__(self) -> Iterator[tuple[str, str, int | float]]:
+        names = self.names
+        for start in range(0, len(self.rows), ITERATION_CHUNK_SIZE):
+            for source, dest, length in self.rows[start:start + ITERATION_CHUNK_SIZE].tolist():
+                yield names[source], names[dest], _as_number(length)
+
+
+def _as_number(length: int | float) -> int | float:
+    # A float column holds lengths like 0 or 3 as 0.0 and 3.0, which were
+    # integers in the graph (GRL literals never produce integral floats)
+    if isinstance(length, float) and length.is_integer():
+        return int(length)
+
+    return length
@@ -0,0 +1,159 @@
+import heapq
+import itertools
+import math
+import weakref
+from collections import OrderedDict
+from operator import itemgetter
+
+import networkx as nx
+
+
+MAX_TREES_PER_GRAPH = 8
+MAX_REPAIR_FRACTION = 0.25
+
+
+class DistanceTree:
+    def __init__(self, graph: nx.Graph, source: str):
+        self.source = source
+        self.distances: dict[str, int | float] = nx.single_source_dijkstra_path_length(
+            graph, source, weight="weight"
+        )
+        self.is_ordered = True
+
+    def relax(self, graph: nx.Graph, source: str, dest: str, weight: int | float) -> bool:
+        """
+        Repairs the tree after edge `source` -> `dest` got inserted or its
+        weight decreased to `weight`. Returns False when the update affects too
+        large a part of the graph and the tree should be recomputed instead.
+        """
+        if source not in self.distances:
+            return True
+
+        candidate = self.distances[source] + weight
+        if candidate >= self.distances.get(dest, math.inf):
+            return True
+
+        limit = max(1, int(len(graph) * MAX_REPAIR_FRACTION))
+        counter = itertools.count()
+        self.distances[dest] = candidate
+        self.is_ordered = False
+        heap = [(candidate, next(counter), dest)]
+
+        while heap:
+            distance, _, node = heapq.heappop(heap)
+            if distance > self.distances[node]:
+                continue
+
+            limit -= 1
+            if limit < 0:
+                return False
+
+            for neighbor, edge_data in graph.adj[node].items():
+                neighbor_distance = distance + edge_data.get("weight", 1)
+                if neighbor_distance < self.distances.get(neighbor, math.inf):
+                    self.distances[neighbor] = neighbor_distance
+                    heapq.heappush(heap, (neighbor_distance, next(counter), neighbor))
+
+        return True
+
+    def uses_edge(self, source: str, dest: str, weight: int | float) -> bool:
+        return (
+            source in self.distances
+            and self.distances[source] + weight == self.distances.get(dest)
+        )
+
+    def ordered_distances(self) -> dict[str, int | float]:
+        if not self.is_ordered:
+            self.distances = dict(sorted(self.distances.items(), key=itemgetter(1)))
+            self.is_ordered = True
+
+        return self.distances
+
+
+class DistanceTreeCache:
+    """
+    Single-source distance trees kept up to date under graph updates.
+
+    A graph is tracked once it has been checked to have no negative weights,
+    which lets later queries skip that check. Edge insertions and
+    weight decreases are repaired in place, while weight increases and
+    removals only drop the trees whose shortest paths went through the
+    changed edge. Trees are recomputed lazily on the next request.
+    """
+
+    def __init__(self):
+        self._trees: weakref.WeakKeyDictionary[nx.Graph, OrderedDict[str, DistanceTree]] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def is_tracked(self, graph: nx.Graph) -> bool:
+        return graph in self._trees
+
+    def track(self, graph: nx.Graph):
+        self._trees.setdefault(graph, OrderedDict())
+
+    def cached_distances(self, graph: nx.Graph, source: str) -> dict[str, int | float] | None:
+        if (tree := self._trees.get(graph, {}).get(source)) is None:
+            return None
+
+        return tree.distances
+
+    def distances(
+        self, graph: nx.Graph, source: str, max_trees: int = MAX_TREES_PER_GRAPH
+    ) -> dict[str, int | float]:
+        """
+        Distances from `source`, keeping at most `max_trees` recently used
+        trees of the graph (none if it's 0).
+        """
+        trees = self._trees.setdefault(graph, OrderedDict())
+        if source in trees:
+            trees.move_to_end(source)
+            return trees[source].ordered_distances()
+
+        tree = DistanceTree(graph, source)
+        if max_trees > 0:
+            trees[source] = tree
+        while len(trees) > max_trees:
+            trees.popitem(last=False)
+
+        return tree.ordered_distances()
+
+    def trees(self, graph: nx.Graph) -> list[DistanceTree]:
+        return list(self._trees.get(graph, {}).values())
+
+    def clear(self, graph: nx.Graph):
+        self._trees.pop(graph, None)
+
+    def _directions(self, graph: nx.Graph, source: str, dest: str) -> list[tuple[str, str]]:
+        return [(source, dest)] if graph.is_directed() else [(source, dest), (dest, source)]
+
+    def edge_added(self, graph: nx.Graph, source: str, dest: str, weight: int | float):
+        trees = self._trees.get(graph, {})
+        for tree_source, tree in list(trees.items()):
+            for edge in self._directions(graph, source, dest):
+                if not tree.relax(graph, *edge, weight):
+                    del trees[tree_source]
+                    break
+
+    def edge_removed(self, graph: nx.Graph, source: str, dest: str, weight: int | float):
+        trees = self._trees.get(graph, {})
+        for tree_source, tree in list(trees.items()):
+            if any(tree.uses_edge(*edge, weight) for edge in self._directions(graph, source, dest)):
+                del trees[tree_source]
+
+    def edge_weight_changed(
+        self, graph: nx.Graph, source: str, dest: str,
+        old_weight: int | float, new_weight: int | float
+    ):
+        if new_weight < 0:
+            self.clear(graph)
+        elif new_weight < old_weight:
+            self.edge_added(graph, source, dest, new_weight)
+        elif new_weight > old_weight:
+            self.edge_removed(graph, source, dest, old_weight)
+
+    def node_removed(self, graph: nx.Graph, node: str):
+        trees = self._trees.get(graph, {})
+        for tree_source, tree in list(trees.items()):
+            if node in tree.distances:
+                del trees[tree_source]
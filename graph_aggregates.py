@@ -0,0 +1,71 @@
+from collections.abc import Iterator
+
+import networkx as nx
+import numpy as np
+
+
+COMPARISONS = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+
+
+def edge_weights(graph: nx.Graph) -> np.ndarray:
+    """
+    Weights of all edges, read into an array in a single pass over the
+    adjacency. The array is integral when all weights are integers (or there
+    are no edges), so aggregates keep their type.
+    """
+    weight_types: set[type] = set()
+
+    def weights() -> Iterator[int | float]:
+        # Walks the adjacency directly, as networkx's edge views are a lot
+        # slower; edges of undirected graphs are skipped from their other end
+        directed = graph.is_directed()
+        seen: set[str] = set()
+        for node, neighbors in graph._adj.items():
+            for neighbor, edge_data in neighbors.items():
+                if directed or neighbor not in seen:
+                    weight = edge_data.get("weight", 1)
+                    weight_types.add(type(weight))
+                    yield weight
+            if not directed:
+                seen.add(node)
+
+    values = np.fromiter(weights(), np.float64)
+    return values.astype(np.int64) if weight_types <= {int} else values
+
+
+def degrees(graph: nx.Graph) -> np.ndarray:
+    return np.fromiter(
+        (degree for _, degree in graph.degree), np.int64, len(graph)
+    )
+
+
+def aggregate(values: np.ndarray, function: str) -> int | float:
+    if function != "SUM" and len(values) == 0:
+        raise ValueError(f"Can't compute {function} of an empty graph")
+
+    match function:
+        case "SUM":
+            return values.sum().item()
+        case "MAX":
+            return values.max().item()
+        case "MIN":
+            return values.min().item()
+        case _:
+            raise ValueError(f"Unknown aggregate function: {repr(function)}")
+
+
+def count_matching(values: np.ndarray, comparator: str, value: int | float) -> int:
+    return int(np.count_nonzero(COMPARISONS[comparator](values, value)))
+
+
+def degree_histogram(graph: nx.Graph) -> list[tuple[int, int]]:
+    counts = np.bincount(degrees(graph))
+    present = np.flatnonzero(counts)
+    return list(zip(present.tolist(), counts[present].tolist()))
@@ -0,0 +1,58 @@
+from collections.abc import Iterable, Iterator
+
+import networkx as nx
+
+
+def bfs_edges(
+    graph: nx.Graph,
+    sources: Iterable[str],
+    depth_limit: int | None = None,
+    target: str | None = None,
+) -> Iterator[tuple[str, str]]:
+    """
+    Breadth-first tree edges explored from all `sources` at once, level by
+    level. Stops after `depth_limit` levels or right after the edge which
+    discovers `target`, so only the explored part of the graph is visited.
+    """
+    frontier = list(dict.fromkeys(sources))
+    visited = set(frontier)
+    if target in visited:
+        return
+
+    depth = 0
+    while frontier and (depth_limit is None or depth < depth_limit):
+        next_frontier = []
+        for node in frontier:
+            for neighbor in graph.neighbors(node):
+                if neighbor in visited:
+                    continue
+
+                visited.add(neighbor)
+                yield node, neighbor
+                if neighbor == target:
+                    return
+
+                next_frontier.append(neighbor)
+
+        frontier = next_frontier
+        depth += 1
+
+
+def dfs_edges(
+    graph: nx.Graph,
+    source: str,
+    depth_limit: int | None = None,
+    target: str | None = None,
+) -> Iterator[tuple[str, str]]:
+    """
+    Depth-first tree edges from `source`, stopping after `depth_limit` levels
+    or right after the edge which discovers `target`.
+    """
+    # networkx treats a depth limit of 0 like 1
+    if source == target or depth_limit == 0:
+        return
+
+    for edge in nx.dfs_edges(graph, source, depth_limit):
+        yield edge
+        if edge[1] == target:
+            return
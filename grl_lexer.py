@@ -5,13 +5,14 @@ class GRLLexer(Lexer):
 
     keywords = {
         STR, NUM, BOOL, # type: ignore
-        ADD, RM, GET, SET, IS, # type: ignore
-        GRAPH_TYPE, NODE, EDGE, WEIGHT, LENGTH, # type: ignore
-        DISTANCE, BETWEEN, FROM, MATRIX, DFS, BFS, # type: ignore
+        ADD, RM, GET, SET, SNAPSHOT, IS, # type: ignore
+        GRAPH_TYPE, DISK, NODE, EDGE, WEIGHT, LENGTH, # type: ignore
+        DISTANCE, BETWEEN, FROM, MATRIX, DFS, BFS, DEPTH, UNTIL, WITHIN, NEAREST, # type: ignore
         NODES, EDGES, TOPOLOGICAL_SORT, SHORTEST_PATH, NEIGHBORS, # type: ignore
-        DRAW, PRINT, EXPORT, IMPORT, EXIT, RUN, # type: ignore
-        FOR, OF, IF, ELSEIF, ELSE, # type: ignore
-        HAS, EXISTS, COUNT, # type: ignore
+        DRAW, PRINT, EXPORT, IMPORT, EXIT, RUN, CHECKPOINT, # type: ignore
+        PARALLEL, FOR, OF, IF, ELSEIF, ELSE, # type: ignore
+        HAS, EXISTS, COUNT, LANDMARKS, MEMORY, # type: ignore
+        SUM, MAX, MIN, DEGREE, HISTOGRAM, WHERE, # type: ignore
     }
 
     tokens = {
@@ -38,6 +39,14 @@ class GRLLexer(Lexer):
     HAS = r"HAS"
     EXISTS = r"EXISTS"
     COUNT = r"COUNT"
+    MEMORY = r"MEMORY"
+
+    SUM = r"SUM"
+    MAX = r"MAX"
+    MIN = r"MIN"
+    DEGREE = r"DEGREE"
+    HISTOGRAM = r"HISTOGRAM"
+    WHERE = r"WHERE"
 
     POWER = r"\*\*"
     PLUS = r"\+"
@@ -58,6 +67,7 @@ class GRLLexer(Lexer):
     NEIGHBORS = r"NEIGHBORS"
 
     GRAPH_TYPE = r"(DI)?GRAPH"
+    DISK = r"DISK"
     NODE = r"NODE"
     EDGE = r"EDGE"
     WEIGHT = r"WEIGHT"
@@ -67,15 +77,22 @@ class GRLLexer(Lexer):
     RM = r"RM"
     GET = r"GET"
     SET = r"SET"
+    SNAPSHOT = r"SNAPSHOT"
     IS = r"IS"
 
     DISTANCE = r"DISTANCE"
     BETWEEN = r"BETWEEN"
     FROM = r"FROM"
     MATRIX = r"MATRIX"
+    WITHIN = r"WITHIN"
+    NEAREST = r"NEAREST"
     DFS = r"DFS"
     BFS = r"BFS"
+    DEPTH = r"DEPTH"
+    UNTIL = r"UNTIL"
+    LANDMARKS = r"LANDMARKS"
 
+    PARALLEL = r"PARALLEL"
     FOR = r"FOR"
     OF = r"OF"
     IF = r"IF"
@@ -95,5 +112,6 @@ class GRLLexer(Lexer):
     EXPORT = r"EXPORT"
     IMPORT = r"IMPORT"
     EXIT = r"EXIT"
+    CHECKPOINT = r"CHECKPOINT"
 
     ID = r"[_a-z][_a-z0-9]*"
@@ -1,14 +1,36 @@
 import codecs
 from collections import defaultdict
+import hashlib
 from io import TextIOWrapper
+from itertools import islice, pairwise
 import json
-from typing import Any
+import os
+import sys
+from operator import itemgetter
+from typing import Any, Iterator
+import weakref
 
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 from sly import Parser
 
+from checkpoint import Checkpoint
 from parse_tree_node import ParseTreeNode
+from snapshot import (
+    prepare_edge_data_mutation, prepare_node_mutation, prepare_node_removal, take_snapshot
+)
+from bounded_dijkstra import bounded_dijkstra
+from disk_graph import DiskDiGraph, DiskGraph
+from distance_matrix import DistanceMatrix
+from distance_tree import MAX_TREES_PER_GRAPH, DistanceTreeCache
+from landmark_index import LandmarkIndex
+from memory_budget import (
+    DISTANCE_ENTRY_BYTES, IMPORTED_BYTES_PER_FILE_BYTE, PAIR_BYTES, REFERENCE_BYTES, MemoryBudget, deep_sizeof
+)
+from parallel_loop import run_parallel
+from graph_aggregates import aggregate, count_matching, degree_histogram, degrees, edge_weights
+from graph_traversal import bfs_edges, dfs_edges
 from grl_lexer import GRLLexer
 
 
@@ -25,6 +47,7 @@ class GRLParser(Parser):
         ("left", "LOGICAL_AND"),
         ("right", "LOGICAL_NOT"),
         ("nonassoc", "COMPARATOR"),
+        ("nonassoc", "WITHIN", "DEPTH", "UNTIL"),
         ("left", "PLUS", "MINUS"),
         ("left", "MULTIPLY", "DIVIDE"),
         ("left", "POWER"),
@@ -33,6 +56,14 @@ class GRLParser(Parser):
 
     def __init__(self):
         self.variables: dict[str, Any] = {}
+        self.compile_only = False
+        self.syntax_error_count = 0
+        self.program_depth = 0
+        self.program_hash = hashlib.sha256()
+        self.top_level_statement: tuple[list[ParseTreeNode[None]], int] | None = None
+        self.distance_trees = DistanceTreeCache()
+        self.memory_budget = MemoryBudget.from_environment()
+        self.landmark_indexes: weakref.WeakKeyDictionary[nx.Graph, LandmarkIndex] = weakref.WeakKeyDictionary()
 
     def _get_variable(self, variable_id: str) -> Any:
         if variable_id not in self.variables:
@@ -50,10 +81,75 @@ class GRLParser(Parser):
         raise TypeError(f"Variable {graph_id} is not a graph")
 
     def _graph_has_negative_weights(self, graph: nx.Graph):
-        return any(
+        if self.distance_trees.is_tracked(graph):
+            return False
+
+        if isinstance(graph, DiskGraph):
+            if graph.has_negative_weights():
+                return True
+        elif any(
             graph.get_edge_data(u, v).get("weight", 1) < 0
             for u, v in graph.edges
+        ):
+            return True
+
+        self.distance_trees.track(graph)
+        return False
+
+    def _on_edge_added(self, graph: nx.Graph, source: str, dest: str, weight: int | float):
+        self.distance_trees.edge_added(graph, source, dest, weight)
+        self.landmark_indexes.pop(graph, None)
+
+    def _on_edge_removed(self, graph: nx.Graph, source: str, dest: str, weight: int | float):
+        self.distance_trees.edge_removed(graph, source, dest, weight)
+
+    def _on_edge_weight_changed(
+        self, graph: nx.Graph, source: str, dest: str,
+        old_weight: int | float, new_weight: int | float
+    ):
+        self.distance_trees.edge_weight_changed(graph, source, dest, old_weight, new_weight)
+        if new_weight < old_weight:
+            self.landmark_indexes.pop(graph, None)
+
+    def _on_node_removed(self, graph: nx.Graph, node: str):
+        self.distance_trees.node_removed(graph, node)
+
+    def _single_source_distances(self, graph: nx.Graph, source: str) -> dict[str, int | float]:
+        if not self._graph_has_negative_weights(graph):
+            # Cached trees count against the memory limit as well
+            max_trees = self.memory_budget.fitting(len(graph) * DISTANCE_ENTRY_BYTES, MAX_TREES_PER_GRAPH)
+            return self.distance_trees.distances(graph, source, max_trees)
+
+        return nx.single_source_bellman_ford_path_length(graph, source, weight="weight")
+
+    def _bounded_distances(
+        self,
+        graph: nx.Graph,
+        source: str,
+        cutoff: int | float | None = None,
+        count: int | None = None
+    ) -> list[tuple[str, int | float]]:
+        if not self._graph_has_negative_weights(graph):
+            return list(bounded_dijkstra(graph, source, cutoff, count).items())
+
+        distances = sorted(
+            nx.single_source_bellman_ford_path_length(graph, source, weight="weight").items(),
+            key=itemgetter(1)
         )
+        if cutoff is not None:
+            distances = [(node, distance) for node, distance in distances if distance <= cutoff]
+
+        return list(islice(distances, count))
+
+    def _shortest_path(self, graph: nx.Graph, source: str, dest: str) -> tuple[int | float, list[str]]:
+        if self._graph_has_negative_weights(graph):
+            path = nx.bellman_ford_path(graph, source, dest, "weight")
+        elif (landmark_index := self.landmark_indexes.get(graph)) is not None:
+            path = nx.astar_path(graph, source, dest, landmark_index.heuristic(dest), "weight")
+        else:
+            return nx.bidirectional_dijkstra(graph, source, dest, "weight")
+
+        return sum(graph.edges[edge].get("weight", 1) for edge in pairwise(path)), path
 
     def _get_new_graph_by_type(self, graph_type: str):
         match graph_type:
@@ -64,19 +160,30 @@ class GRLParser(Parser):
             case _:
                 raise ValueError(f"Unknown graph type: {repr(graph_type)}")
 
+    def _get_new_disk_graph_by_type(self, graph_type: str, file_path: str):
+        match graph_type:
+            case "GRAPH":
+                return DiskGraph(file_path + ".grldb")
+            case "DIGRAPH":
+                return DiskDiGraph(file_path + ".grldb")
+            case _:
+                raise ValueError(f"Unknown graph type: {repr(graph_type)}")
+
     def _import_graph(self, graph_id: str, file: TextIOWrapper):
         graph_type = file.readline()
         graph = self._get_new_graph_by_type(graph_type[:-1])
 
         graph_json = json.load(file)
         for source in graph_json:
+            source = sys.intern(source)
             graph.add_node(source)
 
             for dest_data in graph_json[source]:
                 match dest_data:
                     case str() as dest:
-                        graph.add_edge(source, dest)
+                        graph.add_edge(source, sys.intern(dest))
                     case (dest, weight):
+                        dest = sys.intern(dest)
                         graph.add_edge(source, dest)
                         graph.edges[source, dest]["weight"] = weight
 
@@ -102,13 +209,159 @@ class GRLParser(Parser):
 
         json.dump(graph_json, file)
 
+    def _traverse(
+        self,
+        graph_id: str,
+        start_nodes: list[str] | tuple[str, ...],
+        depth: int | float | None = None,
+        target: str | None = None,
+        breadth_first: bool = False,
+    ) -> list[tuple[str, str]]:
+        graph = self._get_graph(graph_id)
+        for node in [*start_nodes] if target is None else [*start_nodes, target]:
+            if node not in graph:
+                raise ValueError(f"Node {node} not in graph {graph_id}")
+        if depth is not None and (not isinstance(depth, int) or depth < 0):
+            raise ValueError(f"Depth must be a non-negative integer, got {depth}")
+
+        description = f"Traversal of graph {graph_id}"
+        if depth is None and target is None:
+            self.memory_budget.check(len(graph) * PAIR_BYTES, description)
+
+        if breadth_first:
+            edges = bfs_edges(graph, start_nodes, depth, target)
+        else:
+            edges = dfs_edges(graph, start_nodes[0], depth, target)
+
+        # Bounded traversals usually explore a small part of the graph, so the
+        # limit is enforced on the edges as they are found
+        return self.memory_budget.collect(edges, PAIR_BYTES, description)
+
+    @staticmethod
+    def _changing_state(keyword: str, statement: ParseTreeNode[None]) -> ParseTreeNode[None]:
+        statement.changes_state = keyword
+        return statement
+
+    def _check_parallel_body(self, statement_sequence: list[ParseTreeNode[None]]):
+        """
+        Rejects statements whose effects would depend on whether the loop runs
+        in worker processes (where they are discarded) or in this process.
+        """
+        pending: list[Any] = list(statement_sequence)
+        while pending:
+            match pending.pop():
+                case ParseTreeNode() as node:
+                    if node.changes_state is not None:
+                        raise ValueError(f"{node.changes_state} is not allowed inside PARALLEL FOR")
+                    pending.extend(node.parameters)
+                case list() | tuple() as items:
+                    pending.extend(items)
+
+    def _run_parallel_loop(
+        self,
+        iterator_ids: tuple[str, ...],
+        items: list[tuple[Any, ...]],
+        statement_sequence: list[ParseTreeNode[None]]
+    ):
+        disk_graphs = [
+            variable for variable in self.variables.values()
+            if isinstance(variable, DiskGraph)
+        ]
+        for graph in disk_graphs:
+            graph.store.flush()
+
+        parent_pid = os.getpid()
+
+        def body(chunk: list[tuple[Any, ...]]):
+            if os.getpid() != parent_pid:
+                for graph in disk_graphs:
+                    graph.store.reconnect()
+
+            # Like in a forked worker, variables set by the body (e.g. by
+            # nested FOR loops) are discarded when running in this process
+            variables = self.variables
+            self.variables = dict(variables)
+            try:
+                for item in chunk:
+                    for iterator_id, value in zip(iterator_ids, item):
+                        self.variables[iterator_id] = value
+                    for statement in statement_sequence:
+                        statement.evaluate()
+            finally:
+                self.variables = variables
+
+        run_parallel(items, body)
+
     # ----- PROGRAM -----
 
+    def error(self, token):
+        self.syntax_error_count += 1
+        return super().error(token)
+
+    def parse(self, tokens):
+        """
+        Parses (and runs) a program. Tokens of the main program are hashed
+        while being read, so that checkpoints can be matched with it; programs
+        started with RUN don't change the hash.
+        """
+        if self.program_depth > 0:
+            return super().parse(tokens)
+
+        program_hash = self.program_hash = hashlib.sha256()
+
+        def hashed(tokens: Iterator[Any]) -> Iterator[Any]:
+            for token in tokens:
+                program_hash.update(f"{token.type}\0{token.value}\0".encode())
+                yield token
+
+        return super().parse(hashed(tokens))
+
+    def compile(self, tokens) -> list[ParseTreeNode[None]] | None:
+        """
+        Parses a program without running it, so that it can be run (possibly
+        multiple times) with `execute`. Returns None on syntax errors.
+        """
+        self.compile_only = True
+        try:
+            return self.parse(tokens)
+        finally:
+            self.compile_only = False
+
+    def execute(self, statement_sequence: list[ParseTreeNode[None]], start: int = 0):
+        self.program_depth += 1
+        try:
+            for position in range(start, len(statement_sequence)):
+                if self.program_depth == 1:
+                    self.top_level_statement = (statement_sequence, position)
+                statement_sequence[position].evaluate()
+        finally:
+            self.program_depth -= 1
+            if self.program_depth == 0:
+                self.top_level_statement = None
+
+        for variable in self.variables.values():
+            if isinstance(variable, DiskGraph):
+                variable.store.flush()
+
+    def resume(self, statement_sequence: list[ParseTreeNode[None]], file_path: str):
+        """
+        Restores the variables saved by `CHECKPOINT file_path` and runs the
+        statements following it.
+        """
+        checkpoint = Checkpoint.load(file_path)
+        if checkpoint.program_hash != self.program_hash.hexdigest():
+            raise ValueError(f"Checkpoint {file_path} was saved by a different program")
+
+        self.variables = checkpoint.variables
+        self.execute(statement_sequence, checkpoint.position)
+
     @_("statement_sequence") # type: ignore
     def program(self, production):
         statement_sequence: list[ParseTreeNode[None]] = production.statement_sequence
-        for statement in statement_sequence:
-            statement.evaluate()
+        if self.compile_only:
+            return statement_sequence
+
+        self.execute(statement_sequence)
 
     # ----- CONTROL FLOW -----
 
@@ -169,7 +422,7 @@ class GRLParser(Parser):
                 for statement in statement_sequence:
                     statement.evaluate()
 
-            del self.variables[iterator_id]
+            self.variables.pop(iterator_id, None)
 
         return ParseTreeNode(
             evaluator,
@@ -190,8 +443,8 @@ class GRLParser(Parser):
                 for statement in statement_sequence:
                     statement.evaluate()
 
-            del self.variables[first_iterator_id]
-            del self.variables[second_iterator_id]
+            self.variables.pop(first_iterator_id, None)
+            self.variables.pop(second_iterator_id, None)
 
         return ParseTreeNode(
             evaluator,
@@ -215,9 +468,9 @@ class GRLParser(Parser):
                 for statement in statement_sequence:
                     statement.evaluate()
 
-            del self.variables[first_iterator_id]
-            del self.variables[second_iterator_id]
-            del self.variables[third_iterator_id]
+            self.variables.pop(first_iterator_id, None)
+            self.variables.pop(second_iterator_id, None)
+            self.variables.pop(third_iterator_id, None)
 
         return ParseTreeNode(
             evaluator,
@@ -225,122 +478,247 @@ class GRLParser(Parser):
             production.triple_iterator, production.statement_sequence
         )
 
-    @_("NODES ID") # type: ignore
-    def single_iterator(self, production):
+    @_("PARALLEL FOR ID OF single_iterator LEFT_CURLY statement_sequence RIGHT_CURLY") # type: ignore
+    def statement(self, production):
+        self._check_parallel_body(production.statement_sequence)
+
+        def evaluator(iterator_id: str, single_iterator: list[Any], statement_sequence: list[ParseTreeNode[None]]):
+            self._run_parallel_loop(
+                (iterator_id,), [(item,) for item in single_iterator], statement_sequence
+            )
+
         return ParseTreeNode(
-            lambda graph_id: [
-                str(item)
-                for item in self._get_graph(graph_id).nodes
-            ],
-            production.ID
+            evaluator,
+            production.ID, production.single_iterator, production.statement_sequence
         )
 
-    @_("TOPOLOGICAL_SORT ID") # type: ignore
-    def single_iterator(self, production):
+    @_("PARALLEL FOR ID COMMA ID OF double_iterator LEFT_CURLY statement_sequence RIGHT_CURLY") # type: ignore
+    def statement(self, production):
+        self._check_parallel_body(production.statement_sequence)
+
+        def evaluator(
+            first_iterator_id: str,
+            second_iterator_id: str,
+            double_iterator: list[Any],
+            statement_sequence: list[ParseTreeNode[None]]
+        ):
+            self._run_parallel_loop(
+                (first_iterator_id, second_iterator_id), double_iterator, statement_sequence
+            )
+
         return ParseTreeNode(
-            lambda graph_id: [
-                str(item)
-                for item in nx.topological_sort(self._get_graph(graph_id))
-            ],
-            production.ID
+            evaluator,
+            production.ID0, production.ID1,
+            production.double_iterator, production.statement_sequence
+        )
+
+    @_("PARALLEL FOR ID COMMA ID COMMA ID OF triple_iterator LEFT_CURLY statement_sequence RIGHT_CURLY") # type: ignore
+    def statement(self, production):
+        self._check_parallel_body(production.statement_sequence)
+
+        def evaluator(
+            first_iterator_id: str,
+            second_iterator_id: str,
+            third_iterator_id: str,
+            triple_iterator: list[Any],
+            statement_sequence: list[ParseTreeNode[None]]
+        ):
+            self._run_parallel_loop(
+                (first_iterator_id, second_iterator_id, third_iterator_id),
+                triple_iterator, statement_sequence
+            )
+
+        return ParseTreeNode(
+            evaluator,
+            production.ID0, production.ID1, production.ID2,
+            production.triple_iterator, production.statement_sequence
         )
 
+    @_("NODES ID") # type: ignore
+    def single_iterator(self, production):
+        def evaluator(graph_id: str):
+            graph = self._get_graph(graph_id)
+            self.memory_budget.check(len(graph) * REFERENCE_BYTES, f"NODES {graph_id}")
+
+            return list(graph.nodes)
+
+        return ParseTreeNode(evaluator, production.ID)
+
+    @_("TOPOLOGICAL_SORT ID") # type: ignore
+    def single_iterator(self, production):
+        def evaluator(graph_id: str):
+            graph = self._get_graph(graph_id)
+            self.memory_budget.check(
+                len(graph) * (REFERENCE_BYTES + DISTANCE_ENTRY_BYTES), f"TOPOLOGICAL SORT {graph_id}"
+            )
+
+            return list(nx.topological_sort(graph))
+
+        return ParseTreeNode(evaluator, production.ID)
+
     @_("SHORTEST_PATH edge ID") # type: ignore
     def single_iterator(self, production):
         def evaluator(graph_id: str, edge: tuple[str, str]):
             graph = self._get_graph(graph_id)
-            has_negative_weights = self._graph_has_negative_weights(graph)
+            if edge[0] not in graph:
+                raise ValueError(f"Node {edge[0]} not in graph {graph_id}")
+            if edge[1] not in graph:
+                raise ValueError(f"Node {edge[1]} not in graph {graph_id}")
+            self.memory_budget.check(
+                len(graph) * (REFERENCE_BYTES + DISTANCE_ENTRY_BYTES), f"SHORTEST PATH {edge[0]} {edge[1]} {graph_id}"
+            )
 
-            return [
-                str(item)
-                for item in nx.shortest_path(
-                    graph, edge[0], edge[1], "weight",
-                    "bellman-ford" if has_negative_weights else "dijkstra"
-                )
-            ]
+            return self._shortest_path(graph, *edge)[1]
 
         return ParseTreeNode(evaluator, production.ID, production.edge)
 
     @_("NEIGHBORS node ID") # type: ignore
     def single_iterator(self, production):
+        def evaluator(graph_id: str, node: str):
+            graph = self._get_graph(graph_id)
+            if node not in graph:
+                raise ValueError(f"Node {node} not in graph {graph_id}")
+            self.memory_budget.check(len(graph.adj[node]) * REFERENCE_BYTES, f"NEIGHBORS {node} {graph_id}")
+
+            return list(graph.neighbors(node))
+
+        return ParseTreeNode(evaluator, production.ID, production.node)
+
+    @_("DFS node ID") # type: ignore
+    def double_iterator(self, production):
         return ParseTreeNode(
-            lambda graph_id, node: [
-                str(item)
-                for item in self._get_graph(graph_id).neighbors(node)
-            ],
+            lambda graph_id, start_node: self._traverse(graph_id, [start_node]),
             production.ID, production.node
         )
 
-    @_("DFS node ID") # type: ignore
+    @_("DFS node ID DEPTH number") # type: ignore
     def double_iterator(self, production):
         return ParseTreeNode(
-            lambda graph_id, start_node: [
-                (str(source), str(dest))
-                for source, dest in nx.dfs_edges(
-                    self._get_graph(graph_id), start_node
-                )
-            ],
-            production.ID, production.node
+            lambda graph_id, start_node, depth: self._traverse(graph_id, [start_node], depth=depth),
+            production.ID, production.node, production.number
         )
 
-    @_("BFS node ID") # type: ignore
+    @_("DFS node ID UNTIL string") # type: ignore
     def double_iterator(self, production):
         return ParseTreeNode(
-            lambda graph_id, start_node: [
-                (str(source), str(dest))
-                for source, dest in nx.bfs_edges(
-                    self._get_graph(graph_id), start_node
-                )
-            ],
-            production.ID, production.node
+            lambda graph_id, start_node, target: self._traverse(graph_id, [start_node], target=target),
+            production.ID, production.node, production.string
         )
 
-    @_("EDGES ID") # type: ignore
+    @_("BFS node_list ID") # type: ignore
     def double_iterator(self, production):
         return ParseTreeNode(
-            lambda graph_id: [
-                (str(source), str(dest))
-                for source, dest in self._get_graph(graph_id).edges
-            ],
-            production.ID
+            lambda graph_id, *start_nodes: self._traverse(graph_id, start_nodes, breadth_first=True),
+            production.ID, *production.node_list
         )
 
+    @_("BFS node_list ID DEPTH number") # type: ignore
+    def double_iterator(self, production):
+        return ParseTreeNode(
+            lambda graph_id, depth, *start_nodes: self._traverse(
+                graph_id, start_nodes, depth=depth, breadth_first=True
+            ),
+            production.ID, production.number, *production.node_list
+        )
+
+    @_("BFS node_list ID UNTIL string") # type: ignore
+    def double_iterator(self, production):
+        return ParseTreeNode(
+            lambda graph_id, target, *start_nodes: self._traverse(
+                graph_id, start_nodes, target=target, breadth_first=True
+            ),
+            production.ID, production.string, *production.node_list
+        )
+
+    @_("EDGES ID") # type: ignore
+    def double_iterator(self, production):
+        def evaluator(graph_id: str):
+            graph = self._get_graph(graph_id)
+            self.memory_budget.check(graph.number_of_edges() * PAIR_BYTES, f"EDGES {graph_id}")
+
+            return list(graph.edges)
+
+        return ParseTreeNode(evaluator, production.ID)
+
     @_("DISTANCE FROM node ID") # type: ignore
     def double_iterator(self, production):
         def evaluator(graph_id: str, node: str):
             graph = self._get_graph(graph_id)
             if node not in graph:
                 raise ValueError(f"Node {node} not in graph {graph_id}")
-
-            has_negative_weights = self._graph_has_negative_weights(graph)
-            shortest_paths: dict[str, int | float] = nx.shortest_path_length(
-                graph,
-                source=node,
-                weight="weight",
-                method="bellman-ford" if has_negative_weights else "dijkstra"
+            self.memory_budget.check(
+                len(graph) * (PAIR_BYTES + DISTANCE_ENTRY_BYTES), f"DISTANCE FROM {node} {graph_id}"
             )
 
-            return list(shortest_paths.items())
+            return list(self._single_source_distances(graph, node).items())
 
         return ParseTreeNode(evaluator, production.ID, production.node)
 
+    @_("DISTANCE FROM node ID WITHIN number") # type: ignore
+    def double_iterator(self, production):
+        def evaluator(graph_id: str, node: str, cutoff: int | float):
+            graph = self._get_graph(graph_id)
+            if node not in graph:
+                raise ValueError(f"Node {node} not in graph {graph_id}")
+
+            # Only the nodes within `cutoff` are settled, so the search stops
+            # as soon as one more of them would go over the limit
+            entry_size = PAIR_BYTES + DISTANCE_ENTRY_BYTES
+            maximum = self.memory_budget.fitting(entry_size, len(graph))
+            return self.memory_budget.collect(
+                self._bounded_distances(graph, node, cutoff=cutoff, count=maximum + 1),
+                entry_size,
+                f"DISTANCE FROM {node} {graph_id} WITHIN {cutoff}"
+            )
+
+        return ParseTreeNode(evaluator, production.ID, production.node, production.number)
+
+    @_("NEAREST number FROM node ID") # type: ignore
+    def double_iterator(self, production):
+        def evaluator(graph_id: str, node: str, count: int | float):
+            graph = self._get_graph(graph_id)
+            if node not in graph:
+                raise ValueError(f"Node {node} not in graph {graph_id}")
+            if not isinstance(count, int) or count < 0:
+                raise ValueError(f"Node count must be a non-negative integer, got {count}")
+            self.memory_budget.check(
+                min(count, len(graph)) * (PAIR_BYTES + DISTANCE_ENTRY_BYTES), f"NEAREST {count} FROM {node} {graph_id}"
+            )
+
+            return self._bounded_distances(graph, node, count=count)
+
+        return ParseTreeNode(evaluator, production.ID, production.node, production.number)
+
+    @_("DEGREE HISTOGRAM ID") # type: ignore
+    def double_iterator(self, production):
+        def evaluator(graph_id: str):
+            graph = self._get_graph(graph_id)
+            self.memory_budget.check(
+                len(graph) * (REFERENCE_BYTES + PAIR_BYTES), f"DEGREE HISTOGRAM {graph_id}"
+            )
+
+            return degree_histogram(graph)
+
+        return ParseTreeNode(evaluator, production.ID)
+
     @_("DISTANCE MATRIX ID") # type: ignore
     def triple_iterator(self, production):
-        def evaluator(graph_id: str) -> list[tuple[str, str, int | float]]:
+        def evaluator(graph_id: str) -> DistanceMatrix:
             graph = self._get_graph(graph_id)
 
+            integral = edge_weights(graph).dtype == np.int64
+            # Matrices over the memory limit are kept in a memory-mapped temporary file
+            row_size = DistanceMatrix.row_dtype(integral).itemsize
+            on_disk = not self.memory_budget.allows(len(graph) ** 2 * row_size)
+
             has_negative_weights = self._graph_has_negative_weights(graph)
-            shortest_paths: dict[str, dict[str, int | float]] = nx.shortest_path_length(
+            shortest_paths: Iterator[tuple[str, dict[str, int | float]]] = nx.shortest_path_length(
                 graph,
                 weight="weight",
                 method="bellman-ford" if has_negative_weights else "dijkstra"
             )
 
-            return [
-                (source, dest, length)
-                for source, length_by_target in shortest_paths
-                for dest, length in length_by_target.items()
-            ]
+            return DistanceMatrix.from_lengths(list(graph.nodes), shortest_paths, integral, on_disk)
 
         return ParseTreeNode(evaluator, production.ID)
 
@@ -368,7 +746,7 @@ class GRLParser(Parser):
 
     @_("EXIT") # type: ignore
     def statement(self, production):
-        return ParseTreeNode(exit, 0)
+        return self._changing_state("EXIT", ParseTreeNode(exit, 0))
 
     @_("PRINT boolean") # type: ignore
     def statement(self, production):
@@ -384,7 +762,11 @@ class GRLParser(Parser):
 
     @_("PRINT ID") # type: ignore
     def statement(self, production):
-        return ParseTreeNode(print, self._get_graph(production.ID))
+        def evaluator(variable_id: str):
+            variable = self._get_variable(variable_id)
+            print(str(variable).upper() if isinstance(variable, bool) else variable)
+
+        return ParseTreeNode(evaluator, production.ID)
 
     @_("PRINT") # type: ignore
     def statement(self, production):
@@ -396,7 +778,21 @@ class GRLParser(Parser):
             with open(file_path) as file:
                 self.parse(self.lexer.tokenize(file.read()))
 
-        return ParseTreeNode(evaluator, production.string)
+        return self._changing_state("RUN", ParseTreeNode(evaluator, production.string))
+
+    @_("CHECKPOINT string") # type: ignore
+    def statement(self, production):
+        def evaluator(file_path: str):
+            match self.top_level_statement:
+                case (statement_sequence, position) if statement_sequence[position] is checkpoint:
+                    Checkpoint(
+                        self.variables, position + 1, self.program_hash.hexdigest()
+                    ).save(file_path)
+                case _:
+                    raise ValueError("CHECKPOINT can only be used at the top level of the main program")
+
+        checkpoint = self._changing_state("CHECKPOINT", ParseTreeNode(evaluator, production.string))
+        return checkpoint
 
     @_("DRAW ID") # type: ignore
     def statement(self, production):
@@ -419,10 +815,13 @@ class GRLParser(Parser):
             if graph_id in self.variables:
                 raise ValueError(f"Entity {graph_id} already exists")
 
+            self.memory_budget.check(
+                os.path.getsize(file_path + ".grlg") * IMPORTED_BYTES_PER_FILE_BYTE, f"IMPORT {graph_id}"
+            )
             with open(file_path + ".grlg") as file:
                 self._import_graph(graph_id, file)
 
-        return ParseTreeNode(evaluator, production.ID, production.string)
+        return self._changing_state("IMPORT", ParseTreeNode(evaluator, production.ID, production.string))
 
     @_("EXPORT ID string") # type: ignore
     def statement(self, production):
@@ -446,13 +845,29 @@ class GRLParser(Parser):
             graph = self._get_graph(graph_id)
             match entity:
                 case str() as node:
-                    graph.add_node(node)
+                    graph.add_node(sys.intern(node))
                 case (source, dest):
-                    graph.add_edge(source, dest)
+                    source, dest = sys.intern(source), sys.intern(dest)
+                    if not graph.has_edge(source, dest):
+                        prepare_node_mutation(graph, source, dest)
+                        graph.add_edge(source, dest)
+                        self._on_edge_added(graph, source, dest, 1)
                 case _:
                     raise ValueError(f"Unknown entity: {entity}")
 
-        return ParseTreeNode(evaluator, production.ID, production.entity)
+        return self._changing_state(production[0], ParseTreeNode(evaluator, production.ID, production.entity))
+
+    @_("ADD DISK GRAPH_TYPE ID string") # type: ignore
+    def statement(self, production):
+        def evaluator(graph_type: str, graph_id: str, file_path: str):
+            if graph_id in self.variables:
+                raise ValueError(f"Entity {graph_id} already exists")
+
+            self.variables[graph_id] = self._get_new_disk_graph_by_type(graph_type, file_path)
+
+        return self._changing_state(
+            "ADD", ParseTreeNode(evaluator, production.GRAPH_TYPE, production.ID, production.string)
+        )
 
     @_("RM entity ID") # type: ignore
     def statement(self, production):
@@ -464,13 +879,42 @@ class GRLParser(Parser):
 
             match entity:
                 case str() as node:
+                    prepare_node_removal(graph, node)
                     graph.remove_node(node)
+                    self._on_node_removed(graph, node)
                 case (source, dest):
+                    edge_data = graph.get_edge_data(source, dest, {})
+                    prepare_node_mutation(graph, source, dest)
                     graph.remove_edge(source, dest)
+                    self._on_edge_removed(graph, source, dest, edge_data.get("weight", 1))
                 case _:
                     raise ValueError(f"Unknown entity: {entity}")
 
-        return ParseTreeNode(evaluator, production.ID, production.entity)
+        return self._changing_state(production[0], ParseTreeNode(evaluator, production.ID, production.entity))
+
+    @_("ADD LANDMARKS number ID") # type: ignore
+    def statement(self, production):
+        def evaluator(graph_id: str, count: int | float):
+            graph = self._get_graph(graph_id)
+            if not isinstance(count, int):
+                raise ValueError(f"Landmark count must be an integer, got {count}")
+            if self._graph_has_negative_weights(graph):
+                raise ValueError(f"Graph {graph_id} has negative weights")
+            self.memory_budget.check(
+                max(count, 0) * len(graph) * DISTANCE_ENTRY_BYTES * (2 if graph.is_directed() else 1),
+                f"{count} landmarks of graph {graph_id}"
+            )
+
+            self.landmark_indexes[graph] = LandmarkIndex(graph, count)
+
+        return self._changing_state("ADD", ParseTreeNode(evaluator, production.ID, production.number))
+
+    @_("RM LANDMARKS ID") # type: ignore
+    def statement(self, production):
+        return self._changing_state("RM", ParseTreeNode(
+            lambda graph_id: self.landmark_indexes.pop(self._get_graph(graph_id), None),
+            production.ID
+        ))
 
     @_("SET WEIGHT OF EDGE edge number ID") # type: ignore
     def statement(self, production):
@@ -478,12 +922,17 @@ class GRLParser(Parser):
             graph = self._get_graph(graph_id)
             if not graph.has_edge(*edge):
                 raise ValueError(f"Edge {edge} not in graph {graph_id}")
+            if nx.is_frozen(graph):
+                raise nx.NetworkXError("Frozen graph can't be modified")
 
+            old_weight = graph.edges[edge].get("weight", 1)
+            prepare_edge_data_mutation(graph, *edge)
             graph.edges[edge]["weight"] = weight
+            self._on_edge_weight_changed(graph, *edge, old_weight, weight)
 
-        return ParseTreeNode(
+        return self._changing_state("SET", ParseTreeNode(
             evaluator, production.ID, production.edge, production.number
-        )
+        ))
 
     @_( # type: ignore
         "SET ID string",
@@ -494,18 +943,31 @@ class GRLParser(Parser):
         def evaluator(variable_id: str, value: str | int | float | bool):
             self.variables[variable_id] = value
 
-        return ParseTreeNode(
+        return self._changing_state("SET", ParseTreeNode(
             evaluator, production.ID, production[2]
-        )
+        ))
 
     @_("SET ID ID") # type: ignore
     def statement(self, production):
         def evaluator(target_id: str, source_id: str):
             self.variables[target_id] = self._get_variable(source_id)
 
-        return ParseTreeNode(
+        return self._changing_state("SET", ParseTreeNode(
             evaluator, production.ID0, production.ID1
-        )
+        ))
+
+    @_("SNAPSHOT ID ID") # type: ignore
+    def statement(self, production):
+        def evaluator(target_id: str, source_id: str):
+            graph = self._get_graph(source_id)
+            if isinstance(graph, DiskGraph):
+                raise TypeError(f"Disk graph {source_id} can't be snapshotted")
+
+            self.variables[target_id] = take_snapshot(graph)
+
+        return self._changing_state("SNAPSHOT", ParseTreeNode(
+            evaluator, production.ID0, production.ID1
+        ))
 
     # ----- ENTITIES -----
 
@@ -569,6 +1031,52 @@ class GRLParser(Parser):
             production.ID
         )
 
+    @_( # type: ignore
+        "SUM WEIGHT ID",
+        "MAX WEIGHT ID",
+        "MIN WEIGHT ID",
+    )
+    def number(self, production):
+        return ParseTreeNode(
+            lambda function, graph_id: aggregate(edge_weights(self._get_graph(graph_id)), function),
+            production[0], production.ID
+        )
+
+    @_( # type: ignore
+        "SUM DEGREE ID",
+        "MAX DEGREE ID",
+        "MIN DEGREE ID",
+    )
+    def number(self, production):
+        return ParseTreeNode(
+            lambda function, graph_id: aggregate(degrees(self._get_graph(graph_id)), function),
+            production[0], production.ID
+        )
+
+    @_("COUNT EDGES ID WHERE WEIGHT COMPARATOR number") # type: ignore
+    def number(self, production):
+        return ParseTreeNode(
+            lambda graph_id, comparator, value: count_matching(
+                edge_weights(self._get_graph(graph_id)), comparator, value
+            ),
+            production.ID, production.COMPARATOR, production.number
+        )
+
+    @_("MEMORY ID") # type: ignore
+    def number(self, production):
+        def evaluator(variable_id: str) -> int:
+            variable = self._get_variable(variable_id)
+            if isinstance(variable, nx.Graph):
+                return deep_sizeof(
+                    variable,
+                    self.distance_trees.trees(variable),
+                    self.landmark_indexes.get(variable)
+                )
+
+            return deep_sizeof(variable)
+
+        return ParseTreeNode(evaluator, production.ID)
+
     @_("GET WEIGHT OF EDGE edge ID") # type: ignore
     def number(self, production):
         def evaluator(graph_id: str, edge: tuple[str, str]):
@@ -589,11 +1097,13 @@ class GRLParser(Parser):
             if edge[1] not in graph:
                 raise ValueError(f"Node {edge[1]} not in graph {graph_id}")
 
-            has_negative_weights = self._graph_has_negative_weights(graph)
-            return nx.shortest_path_length(
-                graph, edge[0], edge[1], "weight",
-                "bellman-ford" if has_negative_weights else "dijkstra"
-            )
+            if (distances := self.distance_trees.cached_distances(graph, edge[0])) is not None:
+                if edge[1] not in distances:
+                    raise nx.NetworkXNoPath(f"Node {edge[1]} not reachable from {edge[0]}")
+
+                return distances[edge[1]]
+
+            return self._shortest_path(graph, *edge)[0]
 
         return ParseTreeNode(evaluator, production.ID, production.edge)
 
@@ -807,6 +1317,10 @@ class GRLParser(Parser):
     def node(self, production):
         return ParseTreeNode[str](lambda x: x, production.string)
 
+    @_("node { COMMA node }") # type: ignore
+    def node_list(self, production) -> list[ParseTreeNode[str]]:
+        return [production.node0] + production.node1
+
     @_("BOOLEAN") # type: ignore
     def boolean(self, production):
         return ParseTreeNode[bool](lambda x: x == "TRUE", production.BOOLEAN)
@@ -0,0 +1,111 @@
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from grl_lexer import GRLLexer
+from grl_parser import GRLParser
+from parse_tree_node import ParseTreeNode
+
+
+COMPILED_STATEMENT_LIMIT = 1024
+
+
+class ReplSession:
+    """
+    Interactive GRL session. Compiled statements are cached by their source
+    line, and the parser (including its per-graph distance trees and landmark
+    indexes) is kept between lines.
+
+    Meta-commands:
+        :time   latency of the last statement
+        :mem    memory allocated by the last statement (enables tracking first)
+    """
+
+    def __init__(self, lexer: GRLLexer, parser: GRLParser):
+        self.lexer = lexer
+        self.parser = parser
+        self.compiled: OrderedDict[str, list[ParseTreeNode[None]]] = OrderedDict()
+
+        self.last_compile_time: float | None = None
+        self.last_execute_time: float | None = None
+        self.last_was_cached = False
+        self.last_memory: tuple[int, int] | None = None
+
+    def _compile(self, line: str) -> list[ParseTreeNode[None]] | None:
+        if (statement_sequence := self.compiled.get(line)) is not None:
+            self.compiled.move_to_end(line)
+            return statement_sequence
+
+        syntax_error_count = self.parser.syntax_error_count
+        statement_sequence = self.parser.compile(self.lexer.tokenize(line))
+        if statement_sequence is not None and self.parser.syntax_error_count == syntax_error_count:
+            self.compiled[line] = statement_sequence
+            if len(self.compiled) > COMPILED_STATEMENT_LIMIT:
+                self.compiled.popitem(last=False)
+
+        return statement_sequence
+
+    def run_line(self, line: str):
+        match line.strip():
+            case ":time":
+                self._print_time()
+                return
+            case ":mem":
+                self._print_memory()
+                return
+
+        self.last_was_cached = line in self.compiled
+        started_at = time.perf_counter()
+        statement_sequence = self._compile(line)
+        compiled_at = time.perf_counter()
+        self.last_compile_time = compiled_at - started_at
+        self.last_execute_time = None
+
+        if statement_sequence is None:
+            return
+
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        try:
+            self.parser.execute(statement_sequence)
+        finally:
+            self.last_execute_time = time.perf_counter() - compiled_at
+            if tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                self.last_memory = (current - memory_before, peak - memory_before)
+
+    def _print_time(self):
+        if self.last_compile_time is None:
+            print("No statement has been run yet")
+            return
+
+        compile_note = "cached" if self.last_was_cached else f"{self.last_compile_time * 1000:.3f} ms"
+        execute_note = (
+            "not run" if self.last_execute_time is None
+            else f"{self.last_execute_time * 1000:.3f} ms"
+        )
+        print(f"Compile: {compile_note}, execute: {execute_note}")
+
+    def _print_memory(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            print("Memory tracking enabled, :mem will report the next statement")
+            return
+
+        if self.last_memory is None:
+            print("No statement has been run since memory tracking was enabled")
+            return
+
+        delta, peak = self.last_memory
+        print(f"Memory delta: {delta / 1024:+.1f} KiB, peak: {peak / 1024:.1f} KiB")
+
+    def run(self):
+        while True:
+            try:
+                self.run_line(input('GLR> '))
+            except EOFError:
+                break
+            except Exception as exc:
+                print(exc)
@@ -0,0 +1,160 @@
+import contextlib
+import functools
+import io
+import json
+import multiprocessing
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, TextIO
+
+import networkx as nx
+
+from grl_lexer import GRLLexer
+from grl_parser import GRLParser
+
+
+_lexer: GRLLexer | None = None
+_preloaded: dict[str, nx.Graph] = {}
+
+
+def _load_graphs(preload: dict[str, str]) -> dict[str, nx.Graph]:
+    parser = GRLParser()
+    for graph_id, file_path in preload.items():
+        with open(file_path + ".grlg") as file:
+            parser._import_graph(graph_id, file)
+
+    return {
+        graph_id: nx.freeze(graph)
+        for graph_id, graph in parser.variables.items()
+    }
+
+
+def _initialize_worker(preload: dict[str, str]):
+    global _lexer, _preloaded
+
+    _lexer = GRLLexer()
+    if not _preloaded:
+        _preloaded = _load_graphs(preload)
+
+
+def _execute(program: str, submitted_at: float) -> dict[str, Any]:
+    assert _lexer is not None
+
+    started_at = time.monotonic()
+    # A new parser per request, so that distance trees and landmark indexes
+    # built by one request aren't kept in the worker or used by later ones
+    parser = GRLParser()
+    parser.variables = dict(_preloaded)
+
+    output, errors = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+        try:
+            parser.parse(_lexer.tokenize(program))
+        except SystemExit:
+            pass
+        except Exception as exc:
+            print(exc, file=errors)
+
+    finished_at = time.monotonic()
+    return {
+        "output": output.getvalue(),
+        "error": errors.getvalue() or None,
+        "queue_latency": started_at - submitted_at,
+        "execution_latency": finished_at - started_at,
+    }
+
+
+class ServiceMetrics:
+    def __init__(self):
+        self.queue_latencies: list[float] = []
+        self.execution_latencies: list[float] = []
+        self.error_count = 0
+
+    def record(self, response: dict[str, Any]):
+        if response.get("error"):
+            self.error_count += 1
+        if "queue_latency" in response:
+            self.queue_latencies.append(response["queue_latency"])
+            self.execution_latencies.append(response["execution_latency"])
+
+    def summary(self) -> dict[str, Any]:
+        def describe(latencies: list[float]) -> dict[str, float]:
+            if len(latencies) < 2:
+                return {"max": latencies[0]} if latencies else {}
+
+            return {
+                "mean": statistics.fmean(latencies),
+                "p50": statistics.median(latencies),
+                "p95": statistics.quantiles(latencies, n=20, method="inclusive")[-1],
+                "max": max(latencies),
+            }
+
+        return {
+            "requests": len(self.queue_latencies),
+            "errors": self.error_count,
+            "queue_latency": describe(self.queue_latencies),
+            "execution_latency": describe(self.execution_latencies),
+        }
+
+
+def serve(
+    worker_count: int,
+    preload: dict[str, str],
+    requests: TextIO = sys.stdin,
+    responses: TextIO = sys.stdout,
+):
+    """
+    Runs GRL programs submitted as JSON lines (`{"id": ..., "program": ...}`)
+    on a pool of warm interpreter processes and writes one JSON line with the
+    captured output and latencies per request. Every request starts with its
+    own variables, which only contain the preloaded (frozen) graphs.
+    """
+    global _preloaded
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        _preloaded = _load_graphs(preload)
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+
+    metrics = ServiceMetrics()
+    lock = threading.Lock()
+
+    def respond(request_id: Any, response: dict[str, Any]):
+        with lock:
+            metrics.record(response)
+            responses.write(json.dumps({"id": request_id, **response}) + "\n")
+            responses.flush()
+
+    def on_done(request_id: Any, future: Future):
+        try:
+            respond(request_id, future.result())
+        except Exception as exc:
+            respond(request_id, {"error": str(exc)})
+
+    with ProcessPoolExecutor(
+        worker_count, mp_context=context,
+        initializer=_initialize_worker, initargs=(preload,)
+    ) as executor:
+        for line in requests:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+            except ValueError as exc:
+                respond(None, {"error": f"Invalid request: {exc}"})
+                continue
+
+            request_id = request.get("id") if isinstance(request, dict) else None
+            if not isinstance(request, dict) or not isinstance(request.get("program"), str):
+                respond(request_id, {"error": 'Invalid request: expected an object with a "program" string'})
+                continue
+
+            future = executor.submit(_execute, request["program"], time.monotonic())
+            future.add_done_callback(functools.partial(on_done, request_id))
+
+    print(json.dumps({"metrics": metrics.summary()}), file=sys.stderr)
@@ -0,0 +1,68 @@
+import math
+from typing import Callable
+
+import networkx as nx
+
+from bounded_dijkstra import bounded_dijkstra
+
+
+class LandmarkIndex:
+    """
+    Precomputed distances from and to a small set of landmarks, used as an
+    A* lower bound (ALT) for point-to-point shortest path queries.
+
+    The bounds stay admissible when weights increase or edges and nodes are
+    removed, but have to be rebuilt after an edge insertion or a weight
+    decrease.
+    """
+
+    def __init__(self, graph: nx.Graph, count: int):
+        if count < 1:
+            raise ValueError(f"Landmark count must be positive, got {count}")
+
+        self.forward: dict[str, dict[str, int | float]] = {}
+        self.backward: dict[str, dict[str, int | float]] = {}
+
+        min_distances: dict[str, int | float] = {}
+        start = next(iter(graph), None)
+        candidate = None if start is None else max(
+            nx.single_source_dijkstra_path_length(graph, start, weight="weight").items(),
+            key=lambda item: item[1]
+        )[0]
+
+        while candidate is not None and len(self.forward) < count:
+            self.forward[candidate] = nx.single_source_dijkstra_path_length(
+                graph, candidate, weight="weight"
+            )
+            self.backward[candidate] = (
+                bounded_dijkstra(graph, candidate, reverse=True)
+                if graph.is_directed()
+                else self.forward[candidate]
+            )
+
+            for node, distance in self.forward[candidate].items():
+                min_distances[node] = min(distance, min_distances.get(node, math.inf))
+
+            candidate = max(
+                (node for node in graph if node not in self.forward),
+                key=lambda node: min_distances.get(node, math.inf),
+                default=None
+            )
+
+    def heuristic(self, target: str) -> Callable[[str, str], int | float]:
+        bounds = [
+            (forward, self.backward[landmark], forward.get(target), self.backward[landmark].get(target))
+            for landmark, forward in self.forward.items()
+        ]
+
+        def evaluator(node: str, _: str) -> int | float:
+            lower_bound = 0
+            for forward, backward, forward_target, backward_target in bounds:
+                if forward_target is not None and (forward_node := forward.get(node)) is not None:
+                    lower_bound = max(lower_bound, forward_target - forward_node)
+                if backward_target is not None and (backward_node := backward.get(node)) is not None:
+                    lower_bound = max(lower_bound, backward_node - backward_target)
+
+            return lower_bound
+
+        return evaluator
@@ -1,21 +1,70 @@
-import sys
+import argparse
+import os
 from grl_lexer import GRLLexer
 from grl_parser import GRLParser
+from grl_repl import ReplSession
+from grl_service import serve
+from memory_budget import MEMORY_LIMIT_VARIABLE, parse_size
 
 
-if __name__ == "__main__":
-    lexer = GRLLexer()
-    parser = GRLParser()
+def parse_arguments() -> argparse.Namespace:
+    argument_parser = argparse.ArgumentParser(description="GRL interpreter")
+    argument_parser.add_argument("file", nargs="?", help="GRL script to run")
+    argument_parser.add_argument(
+        "--resume", metavar="PATH",
+        help="continue the script after the statement CHECKPOINT \"PATH\""
+    )
+    argument_parser.add_argument(
+        "--memory-limit", type=parse_size, metavar="SIZE",
+        help=f"largest estimated size of a single result, e.g. 512M (defaults to ${MEMORY_LIMIT_VARIABLE})"
+    )
+    argument_parser.add_argument(
+        "--serve", action="store_true",
+        help="run programs submitted as JSON lines on standard input"
+    )
+    argument_parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="number of interpreter processes used by --serve"
+    )
+    argument_parser.add_argument(
+        "--preload", action="append", default=[], metavar="ID=PATH",
+        help="graph imported once and shared read-only by every --serve request"
+    )
+
+    arguments = argument_parser.parse_args()
+    if arguments.resume and not arguments.file:
+        argument_parser.error("--resume requires the script which saved the checkpoint")
+    for item in arguments.preload:
+        if "=" not in item:
+            argument_parser.error(f"--preload expects ID=PATH, got {repr(item)}")
 
-    if len(sys.argv) == 2:
-        with open(sys.argv[1]) as file:
-            program = file.read()
+    return arguments
 
-        parser.parse(lexer.tokenize(program))
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    if arguments.memory_limit is not None:
+        # Also read by the parsers created in --serve worker processes
+        os.environ[MEMORY_LIMIT_VARIABLE] = str(arguments.memory_limit)
+
+    if arguments.serve:
+        serve(
+            arguments.workers,
+            dict(item.split("=", 1) for item in arguments.preload)
+        )
     else:
-        while True:
-            try:
-                statement = input('GLR> ')
-                parser.parse(lexer.tokenize(statement))
-            except Exception as exc:
-                print(exc)
+        lexer = GRLLexer()
+        parser = GRLParser()
+
+        if arguments.file:
+            with open(arguments.file) as file:
+                program = file.read()
+
+            if arguments.resume:
+                statement_sequence = parser.compile(lexer.tokenize(program))
+                if statement_sequence is not None:
+                    parser.resume(statement_sequence, arguments.resume)
+            else:
+                parser.parse(lexer.tokenize(program))
+        else:
+            ReplSession(lexer, parser).run()
@@ -0,0 +1,130 @@
+import os
+import re
+import sys
+import types
+from collections.abc import Iterable
+from itertools import islice
+from typing import Any, TypeVar
+
+import numpy as np
+
+
+MEMORY_LIMIT_VARIABLE = "GRL_MEMORY_LIMIT"
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+# Approximate cost of one item of an iterator list (pointer in the list and
+# the tuple itself), not counting the node names shared with the graph
+REFERENCE_BYTES = 8
+PAIR_BYTES = sys.getsizeof((None, None)) + REFERENCE_BYTES
+
+# Approximate cost of one entry in a node -> distance dictionary
+DISTANCE_ENTRY_BYTES = 100
+
+# Approximate ratio of the memory used by an imported graph to the size of
+# its .grlg file
+IMPORTED_BYTES_PER_FILE_BYTE = 20
+
+T = TypeVar("T")
+
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+
+def parse_size(text: str) -> int:
+    """Parses sizes such as `1048576`, `512M` or `1.5G` (binary units)."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d*)?)\s*([KMGT]?)i?B?\s*", text, re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Invalid memory size: {repr(text)}")
+
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(size: int | float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+
+    return f"{size:.1f} TiB"
+
+
+def deep_sizeof(*objects: Any) -> int:
+    """
+    Estimated memory used by `objects` and everything reachable from them
+    through containers and instance attributes. Objects shared between several
+    parts (e.g. interned node names) are counted once.
+    """
+    seen: set[int] = set()
+    stack = list(objects)
+    size = 0
+
+    while stack:
+        item = stack.pop()
+        if item is None or id(item) in seen or isinstance(item, _OPAQUE_TYPES):
+            continue
+
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+
+        match item:
+            case dict():
+                stack.extend(item.keys())
+                stack.extend(item.values())
+            case list() | tuple() | set() | frozenset():
+                stack.extend(item)
+            case np.ndarray():
+                # Views and memory-mapped arrays don't own their data
+                if item.base is not None:
+                    stack.append(item.base)
+            case _ if hasattr(item, "__dict__"):
+                stack.append(vars(item))
+
+    return size
+
+
+class MemoryBudget:
+    """
+    Upper bound for the estimated size of a single result, e.g. an iterator
+    list. The limit is read from the `GRL_MEMORY_LIMIT` environment variable
+    and results are not limited when it is unset.
+    """
+
+    def __init__(self, limit: int | None = None):
+        self.limit = limit
+
+    @classmethod
+    def from_environment(cls) -> "MemoryBudget":
+        limit = os.environ.get(MEMORY_LIMIT_VARIABLE)
+        return cls(parse_size(limit) if limit else None)
+
+    def allows(self, size: int) -> bool:
+        return self.limit is None or size <= self.limit
+
+    def fitting(self, item_size: int, maximum: int) -> int:
+        """Number of items of `item_size` bytes (at most `maximum`) within the limit."""
+        if self.limit is None:
+            return maximum
+
+        return min(maximum, self.limit // max(item_size, 1))
+
+    def check(self, size: int, description: str):
+        if not self.allows(size):
+            raise MemoryError(
+                f"{description} would use about {format_size(size)}, "
+                f"over the memory limit of {format_size(self.limit)}"
+            )
+
+    def collect(self, items: Iterable[T], item_size: int, description: str) -> list[T]:
+        """
+        Lists `items`, failing as soon as one more would go over the limit, so
+        results which stay small are allowed however large their source is.
+        """
+        if self.limit is None:
+            return list(items)
+
+        maximum = self.limit // max(item_size, 1)
+        collected = list(islice(items, maximum + 1))
+        if len(collected) > maximum:
+            raise MemoryError(f"{description} would use more than the memory limit of {format_size(self.limit)}")
+
+        return collected
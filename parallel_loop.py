@@ -0,0 +1,65 @@
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+from typing import Any, Callable, Sequence
+
+
+CHUNKS_PER_WORKER = 4
+
+_items: Sequence[Any] | None = None
+_body: Callable[[Sequence[Any]], None] | None = None
+
+
+def _capture_output(body: Callable[[Sequence[Any]], None], items: Sequence[Any]) -> str:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        body(items)
+
+    return output.getvalue()
+
+
+def _run_chunk(bounds: tuple[int, int]) -> str:
+    assert _items is not None and _body is not None
+
+    start, stop = bounds
+    return _capture_output(_body, _items[start:stop])
+
+
+def run_parallel(items: Sequence[Any], body: Callable[[Sequence[Any]], None]):
+    """
+    Runs `body` over consecutive chunks of `items` in forked worker processes.
+
+    Workers inherit a copy-on-write snapshot of the interpreter state, so the
+    body must not change it (the parser rejects such statements, so that the
+    result doesn't depend on the number of CPUs). Printed output is captured
+    and written out in iteration order once every chunk has finished, so
+    nothing is printed if the body fails, wherever it runs.
+    """
+    global _items, _body
+
+    worker_count = min(os.cpu_count() or 1, len(items))
+    if (
+        worker_count < 2
+        or multiprocessing.current_process().daemon
+        or "fork" not in multiprocessing.get_all_start_methods()
+    ):
+        sys.stdout.write(_capture_output(body, items))
+        return
+
+    chunk_size = -(-len(items) // (worker_count * CHUNKS_PER_WORKER))
+    bounds = [
+        (start, min(start + chunk_size, len(items)))
+        for start in range(0, len(items), chunk_size)
+    ]
+
+    _items, _body = items, body
+    sys.stdout.flush()
+    try:
+        with multiprocessing.get_context("fork").Pool(worker_count) as pool:
+            outputs = pool.map(_run_chunk, bounds)
+    finally:
+        _items = _body = None
+
+    sys.stdout.write("".join(outputs))
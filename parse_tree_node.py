@@ -5,6 +5,9 @@ T = TypeVar("T")
 
 
 class ParseTreeNode(Generic[T]):
+    # Keyword of a statement which changes variables, graphs or control flow
+    changes_state: str | None = None
+
     def __init__(self, evaluator: Callable[..., T], *parameters: "ParseTreeNode | Any"):
         self.evaluator = evaluator
         self.parameters = parameters
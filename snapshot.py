@@ -0,0 +1,61 @@
+import networkx as nx
+
+
+def take_snapshot(graph: nx.Graph) -> nx.Graph:
+    """
+    Creates a frozen copy of `graph` which shares the per-node adjacency and
+    edge attribute dictionaries with it. Only the outer node and adjacency
+    dictionaries are copied; the original graph copies a shared inner
+    dictionary the first time it gets modified (see `prepare_node_mutation`
+    and `prepare_edge_data_mutation`).
+    """
+    snapshot = graph.__class__()
+    snapshot.graph.update(graph.graph)
+    snapshot._node = graph._node.copy()
+    snapshot._adj = graph._adj.copy()
+    if graph.is_directed():
+        snapshot._succ = snapshot._adj
+        snapshot._pred = graph._pred.copy()
+
+    graph._cow_owned = set()
+    return nx.freeze(snapshot)
+
+
+def prepare_node_mutation(graph: nx.Graph, *nodes: str):
+    owned: set[str] | None = getattr(graph, "_cow_owned", None)
+    if owned is None:
+        return
+
+    for node in nodes:
+        if node in owned or node not in graph._adj:
+            continue
+
+        graph._adj[node] = graph._adj[node].copy()
+        if graph.is_directed():
+            graph._pred[node] = graph._pred[node].copy()
+
+        owned.add(node)
+
+
+def prepare_node_removal(graph: nx.Graph, node: str):
+    if getattr(graph, "_cow_owned", None) is None or node not in graph._adj:
+        return
+
+    neighbors = list(graph._adj[node])
+    if graph.is_directed():
+        neighbors.extend(graph._pred[node])
+
+    prepare_node_mutation(graph, node, *neighbors)
+
+
+def prepare_edge_data_mutation(graph: nx.Graph, source: str, dest: str):
+    if getattr(graph, "_cow_owned", None) is None or not graph.has_edge(source, dest):
+        return
+
+    prepare_node_mutation(graph, source, dest)
+    edge_data = graph._adj[source][dest].copy()
+    graph._adj[source][dest] = edge_data
+    if graph.is_directed():
+        graph._pred[dest][source] = edge_data
+    else:
+        graph._adj[dest][source] = edge_data